@@ -0,0 +1,100 @@
+"""
+Distil ProsusAI/finbert into a 6-layer DistilBERT student for faster inference
+Teacher soft labels come from FinBERT itself, so any file of headlines works (one per line)
+
+Usage: python distil_finbert.py headlines.txt
+Then set FINBERT_MODEL=./finbert-distil before running main.py
+"""
+import random
+import sys
+from typing import List
+
+import torch
+import torch.nn.functional as F
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+TEACHER_NAME = "ProsusAI/finbert"
+STUDENT_NAME = "distilbert-base-uncased"
+OUTPUT_DIR = "./finbert-distil"
+EPOCHS = 3
+BATCH_SIZE = 32
+LEARNING_RATE = 5e-5
+TEMPERATURE = 2.0
+# Weight of the soft (KL) loss vs the hard (CE on teacher argmax) loss
+ALPHA = 0.5
+MAX_SEQ_LENGTH = 128
+
+
+def load_headlines(path: str) -> List[str]:
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python distil_finbert.py <headlines.txt>")
+        sys.exit(1)
+
+    headlines = load_headlines(sys.argv[1])
+    print(f"📰 Loaded {len(headlines)} headlines")
+
+    teacher_tokenizer = AutoTokenizer.from_pretrained(TEACHER_NAME)
+    teacher = AutoModelForSequenceClassification.from_pretrained(TEACHER_NAME).eval()
+
+    # Student keeps the teacher's label order so main.py's positive/negative indices still hold
+    student_tokenizer = AutoTokenizer.from_pretrained(STUDENT_NAME)
+    student = AutoModelForSequenceClassification.from_pretrained(
+        STUDENT_NAME,
+        num_labels=teacher.config.num_labels,
+        id2label=teacher.config.id2label,
+        label2id=teacher.config.label2id
+    )
+    optimizer = torch.optim.AdamW(student.parameters(), lr=LEARNING_RATE)
+
+    # Teacher logits are fixed, so compute them once up front
+    teacher_logits = []
+    with torch.inference_mode():
+        for start in range(0, len(headlines), BATCH_SIZE):
+            inputs = teacher_tokenizer(
+                headlines[start:start + BATCH_SIZE], return_tensors="pt",
+                truncation=True, padding=True, max_length=MAX_SEQ_LENGTH
+            )
+            teacher_logits.append(teacher(**inputs).logits)
+    teacher_logits = torch.cat(teacher_logits)
+
+    student.train()
+    indices = list(range(len(headlines)))
+    for epoch in range(1, EPOCHS + 1):
+        random.shuffle(indices)
+        total_loss = 0.0
+        for start in range(0, len(indices), BATCH_SIZE):
+            batch_idx = indices[start:start + BATCH_SIZE]
+            inputs = student_tokenizer(
+                [headlines[i] for i in batch_idx], return_tensors="pt",
+                truncation=True, padding=True, max_length=MAX_SEQ_LENGTH
+            )
+            target = teacher_logits[batch_idx]
+            logits = student(**inputs).logits
+
+            soft_loss = F.kl_div(
+                F.log_softmax(logits / TEMPERATURE, dim=-1),
+                F.softmax(target / TEMPERATURE, dim=-1),
+                reduction="batchmean"
+            ) * TEMPERATURE ** 2
+            hard_loss = F.cross_entropy(logits, target.argmax(dim=-1))
+            loss = ALPHA * soft_loss + (1 - ALPHA) * hard_loss
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total_loss += loss.item() * len(batch_idx)
+
+        print(f"  Epoch {epoch}/{EPOCHS}: loss {total_loss / len(indices):.4f}")
+
+    student.save_pretrained(OUTPUT_DIR)
+    student_tokenizer.save_pretrained(OUTPUT_DIR)
+    print(f"✅ Distilled model saved to {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
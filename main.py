@@ -1,25 +1,108 @@
-import feedparser
+import fastfeedparser as feedparser
 from datetime import datetime
 import time
-from typing import List, Dict, Tuple, Set
+import asyncio
+import argparse
+import aiohttp
+import ahocorasick
+from typing import List, Dict, Tuple, Set, Optional
 import json
+import orjson
 import os
+import hashlib
+import heapq
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
+import torch.nn.functional as F
+import numpy as np
 from collections import defaultdict
 from dotenv import load_dotenv
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 import smtplib
+import diskcache
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from apscheduler.schedulers.blocking import BlockingScheduler
+from model_config import MODEL_NAME, QUANTIZED_MODEL_DIR, QUANTIZED_MODEL_FILE, QUANTIZED_SOURCE_FILE
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+except ImportError:
+    ORTModelForSequenceClassification = None
 
 load_dotenv()
 
+# Headlines + summaries rarely need more than 128 tokens, and attention cost grows with seq²
+# The compiled model always sees (INFERENCE_BATCH_SIZE, MAX_SEQ_LENGTH) so it never recompiles
+INFERENCE_BATCH_SIZE = 16
+MAX_SEQ_LENGTH = 128
+
+# FinBERT is deterministic, so scores for repeated/syndicated headlines can be reused
+SENTIMENT_CACHE_DIR = "./.sentiment_cache"
+# Kept for several scan periods (daily runs) so day-over-day repeats still hit
+SENTIMENT_CACHE_TTL = 3 * 86400
+
+# Some feeds reject requests without a browser-like user agent
+FEED_USER_AGENT = "Mozilla/5.0 (compatible; TickerSentimentMonitor/1.0)"
+
+# Daemon mode scans at market close
+MARKET_TIMEZONE = "America/New_York"
+
+# Labels/badges for score > 0.5, > 0.1, < -0.5, < -0.1 (anything else is neutral)
+SENTIMENT_LABELS = ("VERY BULLISH", "Bullish", "VERY BEARISH", "Bearish")
+BADGE_CLASSES = ("very-bullish", "bullish", "very-bearish", "bearish")
+
+def _score_buckets(scores: np.ndarray, choices: Tuple[str, ...], default: str) -> List[str]:
+    """Map each score to one of choices (see SENTIMENT_LABELS for the order) in one vectorized pass"""
+    conditions = [scores > 0.5, scores > 0.1, scores < -0.5, scores < -0.1]
+    return np.select(conditions, choices, default=default).tolist()
+
+def _quantized_export_matches(model_name: str) -> bool:
+    """Check that ./finbert-int8 exists and was exported from model_name (see quantize_finbert.py)"""
+    try:
+        with open(os.path.join(QUANTIZED_MODEL_DIR, QUANTIZED_SOURCE_FILE)) as f:
+            return f.read().strip() == model_name
+    except OSError:
+        return False
+
+def _half_precision_dtype(device: str) -> Optional[torch.dtype]:
+    """
+    Pick a 16-bit dtype the hardware runs natively
+    FP16 on CUDA (Tensor Cores), BF16 on CPUs with AVX512-BF16/AMX, otherwise None (stay FP32)
+    """
+    if device == "cuda":
+        return torch.float16
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu_flags = f.read()
+    except OSError:
+        return None
+    if "avx512_bf16" in cpu_flags or "amx_bf16" in cpu_flags:
+        return torch.bfloat16
+    return None
+
 class TickerSentimentMonitor:
+    # Special case filters for known false positives
+    _FP_FILTERS = {
+        'OPEN': {
+            'exclude_phrases': ('openai', 'open ai', 'open-ai', 'open source'),
+            'require_context': ('opendoor', 'real estate', 'housing')
+        },
+        'MSTR': {
+            'exclude_phrases': ('armstrong', 'arm strong'),
+            'require_context': ('microstrategy', 'bitcoin', 'saylor')
+        },
+        'FIG': {
+            'exclude_phrases': ('figure', 'figures'),
+            'require_context': ()
+        }
+    }
+
     def __init__ (self, gmail_user: str, gmail_password: str, recipient_email: str, watch_tickers: List[str], mappings_file: str = 'ticker_mappings.json'):
         
         self.gmail_user = gmail_user
         self.gmail_password = gmail_password
         self.recipient_email = recipient_email
+        self._server = None
         self.watch_tickers = [ticker.upper() for ticker in watch_tickers]
 
         print("=" * 20)
@@ -30,15 +113,47 @@ class TickerSentimentMonitor:
         self.ticker_to_names = {
             ticker: names for ticker, names in self.ticker_to_names.items() if ticker in self.watch_tickers
         }
+        self.alias_matcher = self._build_alias_matcher()
+        # Every possible match starts with one of these, so texts without any can be skipped
+        self._alias_firstchars = {
+            name[0].lower() for aliases in self.ticker_to_names.values() for name in aliases if name
+        } | {ticker[0].lower() for ticker in self.watch_tickers if ticker}
         print(f"👀 Watching tickers: {', '.join(self.watch_tickers)}")
-        print(f"🕐 Starting scan at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         start = time.time()
 
-        self.tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-        self.model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if ORTModelForSequenceClassification is not None and _quantized_export_matches(MODEL_NAME):
+            self.device = "cpu"
+            self.tokenizer = AutoTokenizer.from_pretrained(QUANTIZED_MODEL_DIR)
+            self.model = ORTModelForSequenceClassification.from_pretrained(
+                QUANTIZED_MODEL_DIR, file_name=QUANTIZED_MODEL_FILE
+            )
+            self.model_kind = "INT8 ONNX"
+            # ONNX Runtime handles any shape, so pad each batch only to its longest text
+            self.fixed_shape = False
+        else:
+            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME).eval()
+            dtype = _half_precision_dtype(self.device)
+            model = model.to(self.device, dtype=dtype)
+            precision = {torch.float16: "FP16", torch.bfloat16: "BF16"}.get(dtype, "FP32")
+            self.model = torch.compile(model, mode="reduce-overhead", dynamic=False)
+            try:
+                # Warm up so compilation happens here rather than on the first real batch
+                self._forward([""] * INFERENCE_BATCH_SIZE, "max_length")
+                self.model_kind = f"{precision} compiled"
+                self.fixed_shape = True
+            except Exception as e:
+                # e.g. no C++ toolchain for Inductor; eager mode gives the same scores
+                print(f"⚠️ torch.compile failed, running eager: {e}")
+                self.model = model
+                self.model_kind = precision
+                self.fixed_shape = False
         load_time = time.time() - start
-        print(f"✅ FinBERT loaded in {load_time:.2f} seconds")
+        self.sentiment_cache = diskcache.Cache(SENTIMENT_CACHE_DIR)
+        self.lexicon = SentimentIntensityAnalyzer()
+        print(f"✅ FinBERT ({self.model_kind}) loaded in {load_time:.2f} seconds")
 
         # RSS Feeds
         self.rss_feeds = [
@@ -51,8 +166,8 @@ class TickerSentimentMonitor:
    
     def load_ticker_mappings(self, mapping_file: str) -> Dict[str, List[str]]:
         try:
-            with open(mapping_file, 'r') as f:
-                data = json.load(f)
+            with open(mapping_file, 'rb') as f:
+                data = orjson.loads(f.read())
             mappings = {}
             for ticker, info in data.items():
                 mappings[ticker] = info.get('aliases', [ticker])
@@ -61,42 +176,40 @@ class TickerSentimentMonitor:
             print(f"⚠️ {mapping_file} not found. Using basic ticker-only matching.")
             return {ticker: [ticker] for ticker in self.watch_tickers}
         
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
         except json.JSONDecodeError as e:
             print(f"❌ Error parsing {mapping_file}: {e}")
             print("⚠️ Using basic ticker-only matching.")
             return {ticker: [ticker] for ticker in self.watch_tickers}
 
-    def _validate_mention(self, text: str, name: str, ticker: str) -> bool:
+    def _build_alias_matcher(self) -> ahocorasick.Automaton:
+        """
+        Build one Aho-Corasick automaton over every lowercased alias
+        so extract_tickers finds all alias hits in a single pass over the text
+        """
+        alias_owners = defaultdict(list)
+        for ticker, aliases in self.ticker_to_names.items():
+            for name in aliases:
+                alias_owners[name.lower()].append((ticker, name))
+
+        automaton = ahocorasick.Automaton()
+        for alias, owners in alias_owners.items():
+            automaton.add_word(alias, owners)
+        automaton.make_automaton()
+        return automaton
+
+    def _validate_mention(self, text_lower: str, name: str, ticker: str) -> bool:
         """
         Validate that a name mention actually refers to the company
         Filters out false positives like "Open AI" vs "Opendoor"
+        Expects text already lowercased by the caller
         """
-        text_lower = text.lower()
-        
-        # Special case filters for known false positives
-        false_positive_filters = {
-            'OPEN': {
-                'exclude_phrases': ['openai', 'open ai', 'open-ai', 'open source'],
-                'require_context': ['opendoor', 'real estate', 'housing']
-            },
-            'MSTR': {
-                'exclude_phrases': ['armstrong', 'arm strong'],
-                'require_context': ['microstrategy', 'bitcoin', 'saylor']
-            },
-            'FIG': {
-                'exclude_phrases': ['figure', 'figures'],
-                'require_context': [] 
-            }
-        }
+        filters = self._FP_FILTERS.get(ticker)
+        if filters is None:
+            return True
         
-        if ticker in false_positive_filters:
-            filters = false_positive_filters[ticker]
-            
-            # Check exclusion phrases
-            for exclude in filters['exclude_phrases']:
-                if exclude in text_lower:
-                    return False  # Found false positive phrase
-        return True
+        # Check exclusion phrases
+        return not any(exclude in text_lower for exclude in filters['exclude_phrases'])
     
     def extract_tickers(self, text: str) -> Set[str]:
         """
@@ -104,57 +217,136 @@ class TickerSentimentMonitor:
         Returns: Set of tickers found
         """
         found_tickers = set()
-        text_upper = text.upper()
         text_lower = text.lower()
+        if self._alias_firstchars.isdisjoint(text_lower):
+            return found_tickers
+        
+        text_upper = text.upper()
         for ticker in self.watch_tickers:
             if ticker not in self.ticker_to_names:
                 # Fallback: just check ticker symbol
                 if ticker in text_upper:
                     found_tickers.add(ticker)
-                continue
-            aliases = self.ticker_to_names[ticker]
-            for name in aliases:
-                name_lower = name.lower()
-                
-                if name_lower in text_lower:
-                    # Additional validation for ambiguous names
-                    if self._validate_mention(text, name, ticker):
-                        found_tickers.add(ticker)
-                        break
+
+        if len(self.alias_matcher) == 0:
+            return found_tickers
+
+        for _, owners in self.alias_matcher.iter(text_lower):
+            for ticker, name in owners:
+                if ticker in found_tickers:
+                    continue
+                # Additional validation for ambiguous names
+                if self._validate_mention(text_lower, name, ticker):
+                    found_tickers.add(ticker)
         
         return found_tickers
     
-    def analyse_sentiment(self, text: str) -> Tuple[str, float]:
-        try:
-            text = text[:512]
-            inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+    def _cache_key(self, text: str) -> bytes:
+        # FinBERT's tokenizer is uncased and ignores whitespace runs, so normalize both
+        normalized = " ".join(text.lower().split())
+        return hashlib.blake2b(f"{MODEL_NAME}|{self.model_kind}|{normalized}".encode(), digest_size=16).digest()
+
+    def analyse_sentiment_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Score many texts, reusing cached results and running FinBERT only on cache misses
+        Returns: List of (sentiment, score) in the same order as texts
+        """
+        keys = [self._cache_key(text) for text in texts]
+        results = [self.sentiment_cache.get(key) for key in keys]
+        
+        # Syndicated headlines share a key, so score each distinct miss once
+        misses = defaultdict(list)
+        for i, result in enumerate(results):
+            if result is None:
+                misses[keys[i]].append(i)
+        
+        if misses:
+            scored = self._score_batch([texts[indices[0]] for indices in misses.values()])
+            for (key, indices), result in zip(misses.items(), scored):
+                if result is None:
+                    # Inference failed; don't cache the fallback
+                    result = ("Neutral", 0.0)
+                else:
+                    self.sentiment_cache.set(key, result, expire=SENTIMENT_CACHE_TTL)
+                for i in indices:
+                    results[i] = result
+        
+        missed = sum(len(indices) for indices in misses.values())
+        print(f"🧠 Sentiment: {len(texts) - missed} cached, {len(misses)} scored")
+        return results
+
+    def analyse_sentiment_lexicon(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Cheap VADER sentiment for articles that don't mention any watched ticker
+        Uses VADER's compound score, which is on the same -1 to +1 scale as FinBERT's
+        """
+        if not texts:
+            return []
+        scores = np.array([self.lexicon.polarity_scores(text)['compound'] for text in texts])
+        labels = _score_buckets(scores, SENTIMENT_LABELS, "Neutral")
+        return list(zip(labels, scores.tolist()))
+
+    def _forward(self, texts: List[str], padding) -> np.ndarray:
+        """Run one forward pass and return positive - negative probability per text"""
+        inputs = self.tokenizer(
+            texts, return_tensors="pt", truncation=True,
+            padding=padding, max_length=MAX_SEQ_LENGTH
+        ).to(self.device)
+        with torch.inference_mode():
             outputs = self.model(**inputs)
-            probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-            positive_prob = probs[0][0].item()
-            negative_prob = probs[0][1].item()
-            score = positive_prob - negative_prob
-            
-            if score > 0.5:
-                sentiment = "VERY BULLISH"
-            elif score > 0.1:
-                sentiment = "Bullish"
-            elif score < -0.5:
-                sentiment = "VERY BEARISH"
-            elif score < -0.1:
-                sentiment = "Bearish"
+            # Softmax in FP32 even when the model runs in FP16/BF16
+            probs = F.softmax(outputs.logits.float(), dim=-1)
+            return (probs[:, 0] - probs[:, 1]).cpu().numpy()
+
+    def _score_batch(self, texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """
+        Score many texts with FinBERT, truncated to MAX_SEQ_LENGTH tokens
+        For the compiled model every batch is padded to (INFERENCE_BATCH_SIZE, MAX_SEQ_LENGTH)
+        so it never recompiles; otherwise batches are padded only to their longest text
+        Returns: List of (sentiment, score) in the same order as texts, None where inference failed
+        """
+        results = []
+        for start in range(0, len(texts), INFERENCE_BATCH_SIZE):
+            batch = texts[start:start + INFERENCE_BATCH_SIZE]
+            if self.fixed_shape:
+                padded = batch + [""] * (INFERENCE_BATCH_SIZE - len(batch))
+                padding = "max_length"
             else:
-                sentiment = "Neutral"
-            
-            return sentiment, score
-            
-        except Exception as e:
-            return "Neutral", 0.0
-        
-    def fetch_and_analyse_articles(self) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+                padded = batch
+                padding = True
+            try:
+                scores = self._forward(padded, padding)[:len(batch)]
+                labels = _score_buckets(scores, SENTIMENT_LABELS, "Neutral")
+                results.extend(zip(labels, scores.tolist()))
+
+            except Exception as e:
+                print(f"❌ Error analysing sentiment: {e}")
+                results.extend(None for _ in batch)
+
+        return results
+
+    async def _fetch_feed(self, session: aiohttp.ClientSession, feed_url: str) -> bytes:
+        async with session.get(feed_url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+    async def _fetch_all(self) -> List:
+        """
+        Download all RSS feeds concurrently
+        Returns: Raw feed body (or the exception raised) per feed, in rss_feeds order
+        """
+        async with aiohttp.ClientSession(headers={'User-Agent': FEED_USER_AGENT}) as session:
+            return await asyncio.gather(
+                *[self._fetch_feed(session, url) for url in self.rss_feeds],
+                return_exceptions=True
+            )
+
+    def fetch_and_analyse_articles(self) -> Tuple[List[Dict], Dict[str, List[Dict]], np.ndarray, Dict[str, Tuple[float, int]]]:
         """
         Fetch articles and categorize by ticker
-        Returns: (all_articles, ticker_articles_map)
+        Returns: (all_articles, ticker_articles_map, scores, ticker_stats)
+        scores is a float32 array aligned with all_articles, and ticker_stats maps each ticker
+        to its (mean score, article count)
         e.g. all_articles = [
             {'title': 'Apple surges', 'tickers': ['AAPL'], ...},
             {'title': 'Tesla drops', 'tickers': ['TSLA'], ...},
@@ -170,15 +362,24 @@ class TickerSentimentMonitor:
             ],
             'TSLA': []  # No articles mentioning TSLA
         }
+        e.g. ticker_stats = {'AAPL': (0.42, 2), 'MSFT': (0.81, 1)}
         """
         all_articles = []
         ticker_articles = defaultdict(list)
+        # FinBERT only scores articles that mention a watched ticker; the rest
+        # only feed the overall market average, so a lexicon scorer is enough
+        finbert_articles, finbert_texts = [], []
+        lexicon_articles, lexicon_texts = [], []
         
         print(f"\n📰 Fetching from {len(self.rss_feeds)} sources...")
         
-        for i, feed_url in enumerate(self.rss_feeds, 1):
+        bodies = asyncio.run(self._fetch_all())
+        
+        for i, (feed_url, body) in enumerate(zip(self.rss_feeds, bodies), 1):
             try:
-                feed = feedparser.parse(feed_url)
+                if isinstance(body, Exception):
+                    raise body
+                feed = feedparser.parse(body)
                 source_name = feed.feed.get('title', feed_url)
                 print(f"  [{i}/{len(self.rss_feeds)}] {source_name}...", end=" ")
                 
@@ -192,21 +393,25 @@ class TickerSentimentMonitor:
                     combined_text = f"{title} {summary}"
                     mentioned_tickers = self.extract_tickers(combined_text)
                     
-                    # Analyse sentiment
-                    sentiment, score = self.analyse_sentiment(combined_text)
-                    
+                    # Sentiment is filled in after the loop in batches
                     article = {
                         'title': title,
                         'link': link,
                         'published': entry.get('published', ''),
                         'summary': summary,
                         'source': source_name,
-                        'sentiment': sentiment,
-                        'score': score,
+                        'sentiment': "Neutral",
+                        'score': 0.0,
                         'tickers': list(mentioned_tickers)
                     }
                     
                     all_articles.append(article)
+                    if mentioned_tickers:
+                        finbert_articles.append(article)
+                        finbert_texts.append(combined_text)
+                    else:
+                        lexicon_articles.append(article)
+                        lexicon_texts.append(combined_text)
                     
                     # Add to ticker-specific lists
                     for ticker in mentioned_tickers:
@@ -219,20 +424,37 @@ class TickerSentimentMonitor:
             except Exception as e:
                 print(f"❌ Error: {e}")
         
+        # Analyse sentiment for all articles at once, keeping a running mean per ticker
+        scored = list(zip(finbert_articles, self.analyse_sentiment_batch(finbert_texts)))
+        scored += zip(lexicon_articles, self.analyse_sentiment_lexicon(lexicon_texts))
+        ticker_stats = {}
+        for article, (sentiment, score) in scored:
+            article['sentiment'] = sentiment
+            article['score'] = score
+            for ticker in article['tickers']:
+                mean, count = ticker_stats.get(ticker, (0.0, 0))
+                count += 1
+                mean += (score - mean) / count
+                ticker_stats[ticker] = (mean, count)
+        
+        # Scores as a flat array for vectorized aggregation in the report
+        scores = np.fromiter((a['score'] for a in all_articles), dtype=np.float32, count=len(all_articles))
+        
         print(f"\n✅ Total articles: {len(all_articles)}")
         print(f"📊 Articles mentioning your tickers:")
         for ticker in self.watch_tickers:
             count = len(ticker_articles.get(ticker, []))
             print(f"   {ticker}: {count} articles")
         # print(all_articles, dict(ticker_articles))
-        return all_articles, dict(ticker_articles)
+        return all_articles, dict(ticker_articles), scores, ticker_stats
 
-    def generate_html_report(self, all_articles: List[Dict], ticker_articles: Dict[str, List[Dict]]) -> str:
+    def generate_html_report(self, all_articles: List[Dict], ticker_articles: Dict[str, List[Dict]],
+                             scores: np.ndarray, ticker_stats: Dict[str, Tuple[float, int]]) -> str:
         """Generate comprehensive HTML email report"""
         
         # Calculate overall market sentiment
         if all_articles:
-            avg_score = sum(a['score'] for a in all_articles) / len(all_articles)
+            avg_score = float(scores.mean())
             
             if avg_score > 0.3:
                 overall = "🟢 BULLISH"
@@ -255,7 +477,7 @@ class TickerSentimentMonitor:
             color = "#6c757d"
         
         # Build HTML
-        html = f"""
+        parts = [f"""
         <html>
         <head>
             <style>
@@ -361,10 +583,10 @@ class TickerSentimentMonitor:
                 <h1>📊 Daily Market & Ticker Sentiment Report</h1>
                 <p>{datetime.now().strftime('%A, %B %d, %Y - %I:%M %p ET')}</p>
             </div>
-        """
+        """]
         
         # Overall Market Sentiment Section
-        html += f"""
+        parts.append(f"""
             <div class="section">
                 <div class="section-title">🌐 Overall Market Sentiment</div>
                 <div style="text-align: center; padding: 20px; background-color: {color}; color: white; border-radius: 8px; font-size: 24px; font-weight: bold;">
@@ -374,7 +596,7 @@ class TickerSentimentMonitor:
                     </div>
                 </div>
             </div>
-        """
+        """)
         
         # Ticker-Specific Sections
         for ticker in self.watch_tickers:
@@ -387,7 +609,7 @@ class TickerSentimentMonitor:
             
             if articles:
                 # Calculate ticker-specific sentiment
-                ticker_avg = sum(a['score'] for a in articles) / len(articles)
+                ticker_avg, _ = ticker_stats[ticker]
                 
                 if ticker_avg > 0.3:
                     ticker_sentiment = "🟢 BULLISH"
@@ -405,7 +627,7 @@ class TickerSentimentMonitor:
                     ticker_sentiment = "⚪ Neutral"
                     ticker_color = "#6c757d"
                 
-                html += f"""
+                parts.append(f"""
                 <div class="section">
                     <div class="ticker-section">
                         <div class="ticker-header">{ticker_name}</div>
@@ -416,25 +638,16 @@ class TickerSentimentMonitor:
                         </div>
                         
                         <div style="font-weight: bold; margin-bottom: 10px; margin-top: 15px;">Recent Headlines:</div>
-                """
+                """)
                 
-                # Sort articles by sentiment score
-                sorted_articles = sorted(articles, key=lambda x: abs(x['score']), reverse=True)
+                # Top 5 articles by sentiment strength
+                top_articles = heapq.nlargest(5, articles, key=lambda x: abs(x['score']))
+                badge_classes = _score_buckets(
+                    np.array([a['score'] for a in top_articles]), BADGE_CLASSES, "neutral"
+                )
                 
-                for article in sorted_articles[:5]:  # Top 5 articles
-                    # Determine badge class
-                    if article['score'] > 0.5:
-                        badge_class = "very-bullish"
-                    elif article['score'] > 0.1:
-                        badge_class = "bullish"
-                    elif article['score'] < -0.5:
-                        badge_class = "very-bearish"
-                    elif article['score'] < -0.1:
-                        badge_class = "bearish"
-                    else:
-                        badge_class = "neutral"
-                    
-                    html += f"""
+                for article, badge_class in zip(top_articles, badge_classes):
+                    parts.append(f"""
                         <div class="article">
                             <div class="article-title">{article['title']}</div>
                             <div class="article-meta">
@@ -443,61 +656,87 @@ class TickerSentimentMonitor:
                             </div>
                             <a href="{article['link']}" target="_blank">Read more →</a>
                         </div>
-                    """
+                    """)
                 
-                html += """
+                parts.append("""
                     </div>
                 </div>
-                """
+                """)
             else:
-                html += f"""
+                parts.append(f"""
                 <div class="section">
                     <div class="ticker-section">
                         <div class="ticker-header">{ticker_name}</div>
                         <p style="color: #666; font-style: italic;">No articles mentioning {ticker} today.</p>
                     </div>
                 </div>
-                """
+                """)
         
-        html += """
+        parts.append("""
         </body>
         </html>
-        """
+        """)
         
-        return html
+        return "".join(parts)
+
+    def _smtp(self) -> smtplib.SMTP_SSL:
+        """Return a logged-in Gmail connection, reusing the open one while it's still alive"""
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+        
+        server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+        server.login(self.gmail_user, self.gmail_password)
+        self._server = server
+        return server
+
+    def close(self):
+        """Close the cached SMTP connection, if any"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
 
     def send_email(self, subject: str, html_content: str):
         """Send HTML email via Gmail"""
         try:
-            msg = MIMEMultipart('alternative')
+            msg = EmailMessage()
             msg['From'] = self.gmail_user
             msg['To'] = self.recipient_email
             msg['Subject'] = subject
+            msg.set_content(html_content, subtype='html')
             
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-            server.login(self.gmail_user, self.gmail_password)
-            server.send_message(msg)
-            server.quit()
+            self._smtp().send_message(msg)
             
             print(f"✅ Email sent successfully to {self.recipient_email}")
             return True
             
         except Exception as e:
             print(f"❌ Error sending email: {e}")
+            self.close()
             return False
         
     def run_daily_scan(self):
-        all_articles, ticker_articles = self.fetch_and_analyse_articles()
-        html_report = self.generate_html_report(all_articles, ticker_articles)
+        print(f"🕐 Starting scan at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        all_articles, ticker_articles, scores, ticker_stats = self.fetch_and_analyse_articles()
+        html_report = self.generate_html_report(all_articles, ticker_articles, scores, ticker_stats)
         
         subject = f"📊 Market & {', '.join(self.watch_tickers[:3])} Sentiment - {datetime.now().strftime('%b %d')}"
         self.send_email(subject, html_report)
         print(f"✅ Daily scan complete!")
 
 def main():
+    parser = argparse.ArgumentParser(description="Ticker-specific market sentiment monitor")
+    parser.add_argument('--daemon', action='store_true',
+                        help="stay resident and scan daily at market close instead of once")
+    args = parser.parse_args()
+    
     gmail_user = os.environ.get('GMAIL_USER')
     gmail_password = os.environ.get('GMAIL_APP_PASSWORD')
     recipient_email = os.environ.get('RECIPIENT_EMAIL', gmail_user)
@@ -508,7 +747,20 @@ def main():
     if not watch_tickers_str:
          print("❌ ERROR: Missing tickers to monitor!")
     monitor = TickerSentimentMonitor(gmail_user, gmail_password, recipient_email, watch_tickers)
-    monitor.run_daily_scan()
+    try:
+        if args.daemon:
+            # Model, matcher and SMTP connection are loaded once and reused by every scan
+            scheduler = BlockingScheduler(timezone=MARKET_TIMEZONE)
+            scheduler.add_job(monitor.run_daily_scan, 'cron', hour=16, minute=0)
+            print(f"⏰ Scheduled daily scan at 16:00 {MARKET_TIMEZONE}")
+            try:
+                scheduler.start()
+            except KeyboardInterrupt:
+                print("👋 Stopping scheduler")
+        else:
+            monitor.run_daily_scan()
+    finally:
+        monitor.close()
 
 if __name__ == "__main__":
     main()
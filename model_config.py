@@ -0,0 +1,17 @@
+"""
+Model settings shared by main.py and the offline model scripts
+Kept free of heavy imports so the scripts don't pull in the whole monitor
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Sentiment model; point at a distilled checkpoint (see distil_finbert.py) for faster inference
+MODEL_NAME = os.environ.get('FINBERT_MODEL', 'ProsusAI/finbert')
+
+# INT8 export produced by quantize_finbert.py
+QUANTIZED_MODEL_DIR = "./finbert-int8"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+# Records which MODEL_NAME the export was built from, so a stale export is never used
+QUANTIZED_SOURCE_FILE = "source_model.txt"
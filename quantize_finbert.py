@@ -0,0 +1,29 @@
+"""
+Export the sentiment model to ONNX and apply dynamic INT8 quantization
+Uses FINBERT_MODEL if set, otherwise ProsusAI/finbert
+Run once before main.py; main.py picks up ./finbert-int8 automatically
+"""
+from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+import os
+
+from model_config import MODEL_NAME, QUANTIZED_MODEL_DIR, QUANTIZED_SOURCE_FILE
+
+
+def main():
+    model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    quantizer = ORTQuantizer.from_pretrained(model)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=QUANTIZED_MODEL_DIR, quantization_config=qconfig)
+    tokenizer.save_pretrained(QUANTIZED_MODEL_DIR)
+    with open(os.path.join(QUANTIZED_MODEL_DIR, QUANTIZED_SOURCE_FILE), 'w') as f:
+        f.write(MODEL_NAME)
+    print(f"✅ INT8 {MODEL_NAME} saved to {QUANTIZED_MODEL_DIR}")
+
+
+if __name__ == "__main__":
+    main()